@@ -1,47 +1,79 @@
 """Koddi Health Check — Streamlit UI."""
 
-import json
+import asyncio
+import atexit
+import functools
+import queue
+import threading
+import time
+from collections import Counter
 from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any, Optional
 
 import httpx
+import msgspec
+import orjson
 import streamlit as st
 
 # ---------------------------------------------------------------------------
 # Data types
 # ---------------------------------------------------------------------------
 
-class Status(Enum):
+class Status(str, Enum):
+    """str subclass so statuses compare, hash, and JSON-serialize as plain strings."""
+
     PASS = "pass"
     WARN = "warn"
     FAIL = "fail"
     SKIPPED = "skipped"
 
 
+# Plain-string keys — a Status hashes like its value, so lookups skip Enum machinery
 STATUS_DISPLAY = {
-    Status.PASS: ("✅", "PASS", "green"),
-    Status.WARN: ("⚠️", "WARN", "orange"),
-    Status.FAIL: ("❌", "FAIL", "red"),
-    Status.SKIPPED: ("⏭️", "SKIPPED", "gray"),
+    "pass": ("✅", "PASS", "green"),
+    "warn": ("⚠️", "WARN", "orange"),
+    "fail": ("❌", "FAIL", "red"),
+    "skipped": ("⏭️", "SKIPPED", "gray"),
 }
 
+# Statuses whose detail expanders start open in the results view
+_EXPANDED_STATUSES = frozenset({Status.FAIL, Status.WARN})
+
+# Console API routes, relative to the base_url configured on the client
+_URLS = {
+    "advertiser": "/member_groups/{mg}/advertisers/{ad}",
+    "campaigns": "/member_groups/{mg}/advertisers/{ad}/campaigns_report",
+    "failures": "/member_groups/{mg}/advertisers/{ad}/entity_registrations/failed/report",
+    "bidders": "/member_groups/{mg}/active_bidders",
+    "entities": "/member_groups/{mg}/attributable_entities",
+}
+
+
+class CheckResult(msgspec.Struct, gc=False):
+    """C-backed record — cheaper to construct and ~half the memory of a dataclass."""
 
-@dataclass
-class CheckResult:
     number: int
     name: str
     status: Status
     details: str
-    extra: dict = field(default_factory=dict)
+    extra: dict = msgspec.field(default_factory=dict)
+
+
+@dataclass
+class RunState:
+    """Mutable state shared by the checks in one run — one slot per check."""
+
+    token: Optional[str] = None
+    results: list[Optional[CheckResult]] = field(default_factory=lambda: [None] * 7)
 
 
 # ---------------------------------------------------------------------------
 # API helpers
 # ---------------------------------------------------------------------------
 
-def make_request(
-    client: httpx.Client,
+async def make_request(
+    client: httpx.AsyncClient,
     method: str,
     url: str,
     token: Optional[str] = None,
@@ -51,177 +83,244 @@ def make_request(
     if token:
         headers["Authorization"] = token
     if method == "GET":
-        return client.get(url, headers=headers)
-    return client.post(url, headers=headers, json=json_body)
+        return await client.get(url, headers=headers)
+    return await client.post(url, headers=headers, json=json_body)
+
+
+def _json(resp: httpx.Response) -> dict:
+    """Parse a response body with orjson — noticeably faster than stdlib json."""
+    return orjson.loads(resp.content)
+
+
+def _parse_or_fail(
+    resp: httpx.Response, number: int, name: str
+) -> tuple[Optional[dict], Optional[CheckResult]]:
+    """Parse the response as JSON, or fail fast on 5xx / non-JSON bodies.
+
+    Gateways tend to answer 502/504 with HTML — checking first skips a parse
+    that could only end in an exception.
+    """
+    if resp.status_code >= 500:
+        return None, CheckResult(number, name, Status.FAIL, f"HTTP {resp.status_code} from API")
+    content_type = resp.headers.get("content-type", "")
+    if "json" not in content_type:
+        return None, CheckResult(
+            number, name, Status.FAIL, f"Non-JSON response ({content_type or 'no content-type'})"
+        )
+    return _json(resp), None
+
+
+def _api_error(data: dict) -> tuple[Any, str]:
+    """Pull the error code and message out of a non-success API response."""
+    return data.get("error_code", "unknown"), data.get("message", data.get("error", "unknown error"))
+
+
+def _check(number: int, name: str):
+    """Wrap a check coroutine with the shared network-failure handling."""
+    def deco(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs) -> CheckResult:
+            try:
+                return await fn(*args, **kwargs)
+            except httpx.TimeoutException:
+                return CheckResult(number, name, Status.FAIL, "Request timed out")
+            except httpx.ConnectError:
+                return CheckResult(number, name, Status.FAIL, "Connection error")
+            except Exception as exc:
+                return CheckResult(number, name, Status.FAIL, f"Unexpected error: {exc}")
+        return wrapper
+    return deco
 
 
 # ---------------------------------------------------------------------------
 # Health checks
 # ---------------------------------------------------------------------------
 
-def check_auth(
-    client: httpx.Client, base_url: str, email: str, password: str, member_group_id: int
-) -> tuple[CheckResult, Optional[str]]:
+class LoginError(Exception):
+    """Login failed — raised so st.cache_data never caches a bad token."""
+
+
+@st.cache_data(ttl=15 * 60, show_spinner=False)
+def _cached_login(base_url: str, email: str, password: str, member_group_id: int, timeout: int) -> str:
+    """Login and return the id_token, reused across reruns while the token is fresh."""
+    resp = httpx.post(
+        f"{base_url}/session/login",
+        json={"email": email, "password": password, "member_group_id": member_group_id},
+        timeout=timeout,
+    )
+    if resp.status_code >= 500:
+        raise LoginError(f"HTTP {resp.status_code} from API")
+    content_type = resp.headers.get("content-type", "")
+    if "json" not in content_type:
+        raise LoginError(f"Non-JSON response ({content_type or 'no content-type'})")
+    data = _json(resp)
+    if data.get("status") == "success":
+        token = data.get("result", {}).get("token", {}).get("id_token")
+        if token:
+            return token
+        raise LoginError("No id_token in response")
+    error_code, error_msg = _api_error(data)
+    raise LoginError(f"Login failed — code {error_code}: {error_msg}")
+
+
+async def check_auth(
+    client: httpx.AsyncClient, email: str, password: str, member_group_id: int, timeout: int,
+    state: RunState,
+) -> CheckResult:
     name = "Authentication"
     try:
-        resp = make_request(
-            client, "POST", f"{base_url}/session/login",
-            json_body={"email": email, "password": password, "member_group_id": member_group_id},
+        # _cached_login blocks on a sync httpx.post; a worker thread keeps the
+        # loop free to run the already-started auction task meanwhile
+        state.token = await asyncio.to_thread(
+            _cached_login,
+            str(client.base_url).rstrip("/"), email, password, member_group_id, timeout,
         )
-        data = resp.json()
-        if data.get("status") == "success":
-            token = data.get("result", {}).get("token", {}).get("id_token")
-            if token:
-                return CheckResult(1, name, Status.PASS, "Authenticated successfully"), token
-            return CheckResult(1, name, Status.FAIL, "No id_token in response"), None
-        error_code = data.get("error_code", "unknown")
-        error_msg = data.get("message", data.get("error", "unknown error"))
-        return CheckResult(1, name, Status.FAIL, f"Login failed — code {error_code}: {error_msg}"), None
+        return CheckResult(1, name, Status.PASS, "Authenticated successfully")
+    except LoginError as exc:
+        return CheckResult(1, name, Status.FAIL, str(exc))
     except httpx.TimeoutException:
-        return CheckResult(1, name, Status.FAIL, "Request timed out"), None
+        return CheckResult(1, name, Status.FAIL, "Request timed out")
     except httpx.ConnectError:
-        return CheckResult(1, name, Status.FAIL, "Connection error — cannot reach API"), None
+        return CheckResult(1, name, Status.FAIL, "Connection error — cannot reach API")
     except Exception as exc:
-        return CheckResult(1, name, Status.FAIL, f"Unexpected error: {exc}"), None
+        return CheckResult(1, name, Status.FAIL, f"Unexpected error: {exc}")
 
 
-def check_advertiser(
-    client: httpx.Client, base_url: str, token: str, member_group_id: int, advertiser_id: int,
-) -> CheckResult:
+def parse_advertiser(data: dict) -> CheckResult:
+    """Pure parser for the advertiser response — no I/O, usable with any dispatch."""
     name = "Advertiser Exists"
-    try:
-        url = f"{base_url}/member_groups/{member_group_id}/advertisers/{advertiser_id}"
-        resp = make_request(client, "GET", url, token=token)
-        data = resp.json()
-        if data.get("status") == "success":
-            r = data.get("result", {})
-            details = (
-                f"Found: {r.get('name', 'N/A')} | status={r.get('status', 'N/A')} | "
-                f"entities={r.get('entity_count', 'N/A')} | currency={r.get('currency_code', 'N/A')}"
-            )
-            return CheckResult(2, name, Status.PASS, details)
-        error_code = data.get("error_code", "unknown")
-        error_msg = data.get("message", data.get("error", "unknown error"))
-        return CheckResult(2, name, Status.FAIL, f"Error {error_code}: {error_msg}")
-    except httpx.TimeoutException:
-        return CheckResult(2, name, Status.FAIL, "Request timed out")
-    except httpx.ConnectError:
-        return CheckResult(2, name, Status.FAIL, "Connection error")
-    except Exception as exc:
-        return CheckResult(2, name, Status.FAIL, f"Unexpected error: {exc}")
+    if data.get("status") == "success":
+        r = data.get("result", {})
+        details = (
+            f"Found: {r.get('name', 'N/A')} | status={r.get('status', 'N/A')} | "
+            f"entities={r.get('entity_count', 'N/A')} | currency={r.get('currency_code', 'N/A')}"
+        )
+        return CheckResult(2, name, Status.PASS, details)
+    error_code, error_msg = _api_error(data)
+    return CheckResult(2, name, Status.FAIL, f"Error {error_code}: {error_msg}")
 
 
-def check_campaigns(
-    client: httpx.Client, base_url: str, token: str, member_group_id: int, advertiser_id: int,
+@_check(2, "Advertiser Exists")
+async def check_advertiser(
+    client: httpx.AsyncClient, token: str, member_group_id: int, advertiser_id: int,
+) -> CheckResult:
+    url = _URLS["advertiser"].format(mg=member_group_id, ad=advertiser_id)
+    resp = await make_request(client, "GET", url, token=token)
+    data, err = _parse_or_fail(resp, 2, "Advertiser Exists")
+    if err:
+        return err
+    return parse_advertiser(data)
+
+
+@_check(3, "Campaigns Report")
+async def check_campaigns(
+    client: httpx.AsyncClient, token: str, member_group_id: int, advertiser_id: int,
 ) -> CheckResult:
     name = "Campaigns Report"
-    try:
-        url = f"{base_url}/member_groups/{member_group_id}/advertisers/{advertiser_id}/campaigns_report"
-        resp = make_request(client, "POST", url, token=token, json_body={"pagination": {"start": 0}})
-        data = resp.json()
-        if data.get("status") != "success":
-            error_code = data.get("error_code", "unknown")
-            error_msg = data.get("message", data.get("error", "unknown error"))
-            return CheckResult(3, name, Status.FAIL, f"Error {error_code}: {error_msg}")
-        result = data.get("result", {})
-        campaigns = result.get("campaigns", [])
-        total = result.get("total", len(campaigns))
-        if total == 0:
-            return CheckResult(3, name, Status.WARN, "Zero campaigns found for this advertiser")
-        lines = [f"Found {total} campaign(s)"]
-        for c in campaigns:
-            lines.append(
-                f"  \u2022 {c.get('name', 'N/A')} | status={c.get('status', 'N/A')} | "
-                f"always_on={c.get('always_on', 'N/A')} | budget={c.get('budget_type', 'N/A')}/{c.get('budget_amount', 'N/A')}"
-            )
-        return CheckResult(3, name, Status.PASS, "\n".join(lines))
-    except httpx.TimeoutException:
-        return CheckResult(3, name, Status.FAIL, "Request timed out")
-    except httpx.ConnectError:
-        return CheckResult(3, name, Status.FAIL, "Connection error")
-    except Exception as exc:
-        return CheckResult(3, name, Status.FAIL, f"Unexpected error: {exc}")
+    url = _URLS["campaigns"].format(mg=member_group_id, ad=advertiser_id)
+    resp = await make_request(
+        client, "POST", url, token=token,
+        json_body={"pagination": {"start": 0, "count": 25}},
+    )
+    data, err = _parse_or_fail(resp, 3, name)
+    if err:
+        return err
+    if data.get("status") != "success":
+        error_code, error_msg = _api_error(data)
+        return CheckResult(3, name, Status.FAIL, f"Error {error_code}: {error_msg}")
+    result = data.get("result", {})
+    campaigns = result.get("campaigns", [])
+    total = result.get("total", len(campaigns))
+    if total == 0:
+        return CheckResult(3, name, Status.WARN, "Zero campaigns found for this advertiser")
+    header = f"Found {total} campaign(s)"
+    if len(campaigns) < total:
+        header += f" (showing first {len(campaigns)})"
+    body = "\n".join(
+        f"  • {c.get('name', 'N/A')} | status={c.get('status', 'N/A')} | "
+        f"always_on={c.get('always_on', 'N/A')} | budget={c.get('budget_type', 'N/A')}/{c.get('budget_amount', 'N/A')}"
+        for c in campaigns
+    )
+    return CheckResult(3, name, Status.PASS, f"{header}\n{body}")
 
 
-def check_entity_failures(
-    client: httpx.Client, base_url: str, token: str, member_group_id: int, advertiser_id: int,
+@_check(4, "Entity Registration Failures")
+async def check_entity_failures(
+    client: httpx.AsyncClient, token: str, member_group_id: int, advertiser_id: int,
 ) -> CheckResult:
     name = "Entity Registration Failures"
-    try:
-        url = f"{base_url}/member_groups/{member_group_id}/advertisers/{advertiser_id}/entity_registrations/failed/report"
-        resp = make_request(client, "POST", url, token=token, json_body={"pagination": {"count": 50, "start": 0}})
-        data = resp.json()
-        if data.get("status") != "success":
-            error_code = data.get("error_code", "unknown")
-            error_msg = data.get("message", data.get("error", "unknown error"))
-            return CheckResult(4, name, Status.FAIL, f"Error {error_code}: {error_msg}")
-        result = data.get("result", {})
-        total = result.get("total", 0)
-        if total == 0:
-            return CheckResult(4, name, Status.PASS, "No entity registration failures")
-        failures = result.get("entity_registrations", [])[:5]
-        lines = [f"{total} registration failure(s) found. First {len(failures)}:"]
-        for f in failures:
-            lines.append(f"  \u2022 [{f.get('error_code', 'N/A')}] {f.get('error_message', 'N/A')}")
-        return CheckResult(4, name, Status.WARN, "\n".join(lines))
-    except httpx.TimeoutException:
-        return CheckResult(4, name, Status.FAIL, "Request timed out")
-    except httpx.ConnectError:
-        return CheckResult(4, name, Status.FAIL, "Connection error")
-    except Exception as exc:
-        return CheckResult(4, name, Status.FAIL, f"Unexpected error: {exc}")
+    url = _URLS["failures"].format(mg=member_group_id, ad=advertiser_id)
+    resp = await make_request(client, "POST", url, token=token, json_body={"pagination": {"count": 50, "start": 0}})
+    data, err = _parse_or_fail(resp, 4, name)
+    if err:
+        return err
+    if data.get("status") != "success":
+        error_code, error_msg = _api_error(data)
+        return CheckResult(4, name, Status.FAIL, f"Error {error_code}: {error_msg}")
+    result = data.get("result", {})
+    total = result.get("total", 0)
+    if total == 0:
+        return CheckResult(4, name, Status.PASS, "No entity registration failures")
+    failures = result.get("entity_registrations", [])[:5]
+    body = "\n".join(
+        f"  • [{f.get('error_code', 'N/A')}] {f.get('error_message', 'N/A')}" for f in failures
+    )
+    return CheckResult(
+        4, name, Status.WARN,
+        f"{total} registration failure(s) found. First {len(failures)}:\n{body}",
+    )
 
 
-def check_active_bidders(
-    client: httpx.Client, base_url: str, token: str, member_group_id: int,
-) -> CheckResult:
+def parse_active_bidders(data: dict) -> CheckResult:
+    """Pure parser for the active-bidders response."""
     name = "Active Bidders Cache"
-    try:
-        url = f"{base_url}/member_groups/{member_group_id}/active_bidders"
-        resp = make_request(client, "GET", url, token=token)
-        data = resp.json()
-        if data.get("status") != "success":
-            error_code = data.get("error_code", "unknown")
-            error_msg = data.get("message", data.get("error", "unknown error"))
-            return CheckResult(5, name, Status.FAIL, f"Error {error_code}: {error_msg}")
-        bidders = data.get("result", {}).get("active_bidders", [])
-        if not bidders:
-            return CheckResult(5, name, Status.WARN, "Active bidders list is empty — no ad groups are active")
-        return CheckResult(5, name, Status.PASS, f"{len(bidders)} active bidder(s) in cache")
-    except httpx.TimeoutException:
-        return CheckResult(5, name, Status.FAIL, "Request timed out")
-    except httpx.ConnectError:
-        return CheckResult(5, name, Status.FAIL, "Connection error")
-    except Exception as exc:
-        return CheckResult(5, name, Status.FAIL, f"Unexpected error: {exc}")
+    if data.get("status") != "success":
+        error_code, error_msg = _api_error(data)
+        return CheckResult(5, name, Status.FAIL, f"Error {error_code}: {error_msg}")
+    bidders = data.get("result", {}).get("active_bidders", [])
+    if not bidders:
+        return CheckResult(5, name, Status.WARN, "Active bidders list is empty — no ad groups are active")
+    return CheckResult(5, name, Status.PASS, f"{len(bidders)} active bidder(s) in cache")
+
+
+@_check(5, "Active Bidders Cache")
+async def check_active_bidders(
+    client: httpx.AsyncClient, token: str, member_group_id: int,
+) -> CheckResult:
+    url = _URLS["bidders"].format(mg=member_group_id)
+    resp = await make_request(client, "GET", url, token=token)
+    data, err = _parse_or_fail(resp, 5, "Active Bidders Cache")
+    if err:
+        return err
+    return parse_active_bidders(data)
 
 
-def check_attributable_entities(
-    client: httpx.Client, base_url: str, token: str, member_group_id: int,
-) -> CheckResult:
+def parse_attributable_entities(data: dict) -> CheckResult:
+    """Pure parser for the attributable-entities response."""
     name = "Attributable Entities Cache"
-    try:
-        url = f"{base_url}/member_groups/{member_group_id}/attributable_entities"
-        resp = make_request(client, "GET", url, token=token)
-        data = resp.json()
-        if data.get("status") != "success":
-            error_code = data.get("error_code", "unknown")
-            error_msg = data.get("message", data.get("error", "unknown error"))
-            return CheckResult(6, name, Status.FAIL, f"Error {error_code}: {error_msg}")
-        entities = data.get("result", {}).get("attributable_entities", [])
-        if not entities:
-            return CheckResult(6, name, Status.WARN, "No attributable entities — conversions won't attribute")
-        return CheckResult(6, name, Status.PASS, f"{len(entities)} attributable entit(ies) in cache")
-    except httpx.TimeoutException:
-        return CheckResult(6, name, Status.FAIL, "Request timed out")
-    except httpx.ConnectError:
-        return CheckResult(6, name, Status.FAIL, "Connection error")
-    except Exception as exc:
-        return CheckResult(6, name, Status.FAIL, f"Unexpected error: {exc}")
+    if data.get("status") != "success":
+        error_code, error_msg = _api_error(data)
+        return CheckResult(6, name, Status.FAIL, f"Error {error_code}: {error_msg}")
+    entities = data.get("result", {}).get("attributable_entities", [])
+    if not entities:
+        return CheckResult(6, name, Status.WARN, "No attributable entities — conversions won't attribute")
+    return CheckResult(6, name, Status.PASS, f"{len(entities)} attributable entit(ies) in cache")
+
+
+@_check(6, "Attributable Entities Cache")
+async def check_attributable_entities(
+    client: httpx.AsyncClient, token: str, member_group_id: int,
+) -> CheckResult:
+    url = _URLS["entities"].format(mg=member_group_id)
+    resp = await make_request(client, "GET", url, token=token)
+    data, err = _parse_or_fail(resp, 6, "Attributable Entities Cache")
+    if err:
+        return err
+    return parse_attributable_entities(data)
 
 
-def check_winning_ads(
-    client: httpx.Client, client_name: str, site_id: str, experience_name: Optional[str],
+async def check_winning_ads(
+    client: httpx.AsyncClient, client_name: str, site_id: str, experience_name: Optional[str],
 ) -> CheckResult:
     name = "Winning Ads (Test Auction)"
     try:
@@ -236,13 +335,13 @@ def check_winning_ads(
         }
         if experience_name:
             body["experience_name"] = experience_name
-        resp = make_request(client, "POST", url, json_body=body)
+        resp = await make_request(client, "POST", url, json_body=body)
         if resp.status_code != 200:
             return CheckResult(
                 7, name, Status.FAIL,
                 f"HTTP {resp.status_code} — auction engine may be misconfigured or client '{client_name}' is not provisioned",
             )
-        data = resp.json()
+        data = _json(resp)
         listings = data.get("sponsored_listings", [])
         count = len(listings)
         detail = (
@@ -259,11 +358,45 @@ def check_winning_ads(
         return CheckResult(7, name, Status.FAIL, f"Unexpected error: {exc}")
 
 
+@st.cache_data(show_spinner=False)
+def _make_json_report(results_tuple: tuple) -> bytes:
+    """Serialize the downloadable report once per distinct result set."""
+    return orjson.dumps(
+        {
+            "checks": [
+                {"check": number, "name": name, "status": status, "details": details}
+                for number, name, status, details in results_tuple
+            ],
+            "overall": "fail" if any(row[2] == "fail" for row in results_tuple) else "pass",
+        },
+        option=orjson.OPT_INDENT_2,
+    )
+
+
 # ---------------------------------------------------------------------------
 # Run all checks
 # ---------------------------------------------------------------------------
 
-def run_checks(
+@st.cache_resource(show_spinner=False)
+def _get_event_loop() -> asyncio.AbstractEventLoop:
+    """A background event loop that outlives reruns, so pooled connections survive."""
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return loop
+
+
+@st.cache_resource(show_spinner=False)
+def get_http_client(base_url: str, timeout: int) -> httpx.AsyncClient:
+    """A keep-alive-warm client shared across reruns; cache_resource owns its lifecycle."""
+    limits = httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=60)
+    client = httpx.AsyncClient(base_url=base_url, timeout=timeout, http2=True, limits=limits)
+    loop = _get_event_loop()
+    atexit.register(lambda: asyncio.run_coroutine_threadsafe(client.aclose(), loop))
+    return client
+
+
+async def run_checks(
+    client: httpx.AsyncClient,
     email: str,
     password: str,
     member_group_id: int,
@@ -271,74 +404,115 @@ def run_checks(
     client_name: str,
     site_id: str,
     experience_name: Optional[str],
-    base_url: str,
     timeout: int,
     progress_callback=None,
 ) -> list[CheckResult]:
-    base_url = base_url.rstrip("/")
-    results: list[CheckResult] = []
-    token: Optional[str] = None
-
-    def report(step: int, total: int, name: str):
-        if progress_callback:
-            progress_callback(step, total, name)
-
-    with httpx.Client(timeout=timeout) as client:
-        # Check 1
-        report(1, 7, "Authentication")
-        auth_result, token = check_auth(client, base_url, email, password, member_group_id)
-        results.append(auth_result)
-
-        auth_dependent = [
-            (2, "Advertiser Exists"),
-            (3, "Campaigns Report"),
-            (4, "Entity Registration Failures"),
-            (5, "Active Bidders Cache"),
-            (6, "Attributable Entities Cache"),
-        ]
-
-        if token is None:
-            for num, name in auth_dependent:
-                report(num, 7, name)
-                results.append(CheckResult(num, name, Status.SKIPPED, "Skipped — authentication failed"))
-        else:
-            # Check 2
-            report(2, 7, "Advertiser Exists")
-            r2 = check_advertiser(client, base_url, token, member_group_id, advertiser_id)
-            results.append(r2)
-
-            if r2.status == Status.FAIL:
-                for num, name in auth_dependent[1:3]:
-                    report(num, 7, name)
-                    results.append(CheckResult(num, name, Status.SKIPPED, "Skipped — advertiser check failed"))
-            else:
-                # Check 3
-                report(3, 7, "Campaigns Report")
-                results.append(check_campaigns(client, base_url, token, member_group_id, advertiser_id))
-
-                # Check 4
-                report(4, 7, "Entity Registration Failures")
-                results.append(check_entity_failures(client, base_url, token, member_group_id, advertiser_id))
+    state = RunState()
+    results = state.results
+    done = 0
+
+    notify = progress_callback or (lambda *args: None)
+
+    def report(name: str):
+        nonlocal done
+        done += 1
+        notify(done, 7, name)
+
+    async def gather_reporting(*coros) -> None:
+        """Run independent checks concurrently, reporting each as it completes."""
+        for future in asyncio.as_completed(coros):
+            result = await future
+            results[result.number - 1] = result
+            report(result.name)
+
+    # Check 7 hits its own origin and needs no auth — start it first so its
+    # round-trip overlaps everything else, including the login (which runs
+    # off-loop via to_thread; awaiting it on-loop would serialize the two)
+    winning_task = asyncio.create_task(
+        check_winning_ads(client, client_name, site_id, experience_name)
+    )
 
-            # Check 5
-            report(5, 7, "Active Bidders Cache")
-            results.append(check_active_bidders(client, base_url, token, member_group_id))
+    # Check 1 — everything else depends on the token
+    results[0] = await check_auth(client, email, password, member_group_id, timeout, state)
+    report(results[0].name)
+
+    auth_dependent = [
+        (2, "Advertiser Exists"),
+        (3, "Campaigns Report"),
+        (4, "Entity Registration Failures"),
+        (5, "Active Bidders Cache"),
+        (6, "Attributable Entities Cache"),
+    ]
+
+    if state.token is None:
+        for num, name in auth_dependent:
+            results[num - 1] = CheckResult(num, name, Status.SKIPPED, "Skipped — authentication failed")
+            report(name)
+    else:
+        # Tier 1: checks 2, 5, 6 only depend on auth — run them together
+        await gather_reporting(
+            check_advertiser(client, state.token, member_group_id, advertiser_id),
+            check_active_bidders(client, state.token, member_group_id),
+            check_attributable_entities(client, state.token, member_group_id),
+        )
 
-            # Check 6
-            report(6, 7, "Attributable Entities Cache")
-            results.append(check_attributable_entities(client, base_url, token, member_group_id))
+        # Tier 2: checks 3 and 4 depend on the advertiser check
+        if results[1].status == Status.FAIL:
+            for num, name in auth_dependent[1:3]:
+                results[num - 1] = CheckResult(num, name, Status.SKIPPED, "Skipped — advertiser check failed")
+                report(name)
+        else:
+            await gather_reporting(
+                check_campaigns(client, state.token, member_group_id, advertiser_id),
+                check_entity_failures(client, state.token, member_group_id, advertiser_id),
+            )
 
-        # Check 7 (no auth)
-        report(7, 7, "Winning Ads (Test Auction)")
-        results.append(check_winning_ads(client, client_name, site_id, experience_name))
+    results[6] = await winning_task
+    report(results[6].name)
 
-    return results
+    return [r for r in results if r is not None]
 
 
 # ---------------------------------------------------------------------------
 # Streamlit UI
 # ---------------------------------------------------------------------------
 
+@st.fragment
+def _render_summary(results: list[CheckResult]) -> None:
+    """Summary metrics — fragment-scoped so other widget events don't repaint it."""
+    counts = Counter(r.status for r in results)
+    passes, warns, fails, skips = (
+        counts[Status.PASS],
+        counts[Status.WARN],
+        counts[Status.FAIL],
+        counts[Status.SKIPPED],
+    )
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Passed", passes)
+    col2.metric("Warnings", warns)
+    col3.metric("Failed", fails)
+    col4.metric("Skipped", skips)
+
+    if fails == 0:
+        st.success("All checks passed!")
+    else:
+        st.error(f"{fails} check(s) failed.")
+
+
+@st.fragment
+def _render_results(results: list[CheckResult]) -> None:
+    """Detailed per-check expanders — fragment-scoped for the same reason."""
+    for r in results:
+        icon, label, color = STATUS_DISPLAY[r.status]
+
+        with st.expander(f"{icon}  Check {r.number}: {r.name} — **{label}**", expanded=(r.status in _EXPANDED_STATUSES)):
+            if "\n" in r.details:
+                st.code(r.details, language=None)
+            else:
+                st.markdown(f":{color}[{r.details}]")
+
+
 st.set_page_config(page_title="Koddi Health Check", page_icon="🩺", layout="wide")
 
 st.title("🩺 Koddi Health Check")
@@ -362,6 +536,9 @@ with st.sidebar:
     base_url = st.text_input("Base URL", value="https://koddi.io/console/v1")
     timeout = st.slider("Timeout (seconds)", min_value=5, max_value=120, value=30)
 
+    if st.button("Force re-auth", use_container_width=True):
+        _cached_login.clear()
+
     st.divider()
     can_run = all([email, password, member_group_id, advertiser_id, client_name])
     run_button = st.button(
@@ -378,63 +555,64 @@ if run_button:
     progress_bar = st.progress(0, text="Starting health checks...")
 
     def on_progress(step: int, total: int, name: str):
-        progress_bar.progress(step / total, text=f"Running Check {step}/{total}: {name}...")
-
-    results = run_checks(
-        email=email,
-        password=password,
-        member_group_id=int(member_group_id),
-        advertiser_id=int(advertiser_id),
-        client_name=client_name,
-        site_id=site_id or "homepage",
-        experience_name=experience_name or None,
-        base_url=base_url,
-        timeout=timeout,
-        progress_callback=on_progress,
+        # Coalesce bursts — each update is a websocket message to the browser,
+        # so skip any that land within 100 ms of the last (except the final one)
+        now = time.monotonic()
+        if step < total and now - st.session_state.get("_last_progress_ts", 0.0) < 0.1:
+            return
+        st.session_state["_last_progress_ts"] = now
+        progress_bar.progress(step / total, text=f"Check {step}/{total} done: {name}")
+
+    # The checks run on the cached background loop so the cached client's
+    # pooled connections stay usable; progress events are relayed through a
+    # queue because only this thread may touch Streamlit elements.
+    loop = _get_event_loop()
+    client = get_http_client(base_url.rstrip("/"), timeout)
+    progress_q: queue.Queue = queue.Queue()
+    future = asyncio.run_coroutine_threadsafe(
+        run_checks(
+            client,
+            email=email,
+            password=password,
+            member_group_id=int(member_group_id),
+            advertiser_id=int(advertiser_id),
+            client_name=client_name,
+            site_id=site_id or "homepage",
+            experience_name=experience_name or None,
+            timeout=timeout,
+            progress_callback=lambda *args: progress_q.put(args),
+        ),
+        loop,
     )
+    while not future.done():
+        try:
+            on_progress(*progress_q.get(timeout=0.1))
+        except queue.Empty:
+            pass
+    while not progress_q.empty():
+        on_progress(*progress_q.get_nowait())
+    results = future.result()
+    st.session_state["results"] = results
 
     progress_bar.empty()
 
-    # --- Summary metrics ---
-    passes = sum(1 for r in results if r.status == Status.PASS)
-    warns = sum(1 for r in results if r.status == Status.WARN)
-    fails = sum(1 for r in results if r.status == Status.FAIL)
-    skips = sum(1 for r in results if r.status == Status.SKIPPED)
-
-    col1, col2, col3, col4 = st.columns(4)
-    col1.metric("Passed", passes)
-    col2.metric("Warnings", warns)
-    col3.metric("Failed", fails)
-    col4.metric("Skipped", skips)
+# Render from session_state so tweaking sidebar options after a run keeps the
+# last results on screen instead of wiping them until the next full run
+if "results" in st.session_state:
+    results = st.session_state["results"]
 
-    if fails == 0:
-        st.success("All checks passed!")
-    else:
-        st.error(f"{fails} check(s) failed.")
+    # --- Summary metrics ---
+    _render_summary(results)
 
     st.divider()
 
     # --- Detailed results ---
-    for r in results:
-        icon, label, color = STATUS_DISPLAY[r.status]
-
-        with st.expander(f"{icon}  Check {r.number}: {r.name} — **{label}**", expanded=(r.status in (Status.FAIL, Status.WARN))):
-            if "\n" in r.details:
-                st.code(r.details, language=None)
-            else:
-                st.markdown(f":{color}[{r.details}]")
+    _render_results(results)
 
     # --- JSON export ---
     st.divider()
-    json_output = json.dumps(
-        {
-            "checks": [
-                {"check": r.number, "name": r.name, "status": r.status.value, "details": r.details}
-                for r in results
-            ],
-            "overall": "fail" if fails > 0 else "pass",
-        },
-        indent=2,
+    json_output = _make_json_report(
+        tuple((r.number, r.name, r.status, r.details) for r in results)
     )
     st.download_button(
         "📥 Download JSON Report",
@@ -443,7 +621,7 @@ if run_button:
         mime="application/json",
     )
 
-elif "results" not in st.session_state:
+else:
     st.markdown(
         """
         ### How to use
@@ -1,18 +1,23 @@
 #!/usr/bin/env python3
 """Koddi Ads implementation health check CLI tool."""
 
-import json
+import argparse
+import asyncio
+import functools
+import hashlib
 import os
+import queue
 import sys
+import threading
+import time
+from collections import Counter
 from dataclasses import dataclass, field
 from enum import Enum
+from pathlib import Path
 from typing import Any, Optional
 
-import click
 import httpx
-from rich.console import Console
-from rich.table import Table
-from rich.text import Text
+import orjson
 
 
 class Status(Enum):
@@ -22,7 +27,7 @@ class Status(Enum):
     SKIPPED = "skipped"
 
 
-@dataclass
+@dataclass(slots=True)
 class CheckResult:
     number: int
     name: str
@@ -31,75 +36,183 @@ class CheckResult:
     extra: dict = field(default_factory=dict)
 
 
-console = Console()
+# Rich costs ~40ms of import time; under --json-output it is never used, so
+# main() only imports and constructs the Console on the human-readable path.
+console = None
+
+
+def _json(resp: httpx.Response) -> dict:
+    """Parse a response body with orjson — same dicts as resp.json(), faster."""
+    return orjson.loads(resp.content)
+
+
+# Pre-encoded request bodies — httpx would json.dumps these on every POST
+_JSON_HEADERS = {"Content-Type": "application/json"}
+_CAMPAIGNS_BODY = orjson.dumps({"pagination": {"start": 0}})
+_FAILURES_BODY = orjson.dumps({"pagination": {"count": 50, "start": 0}})
+
+
+async def _stream_post(client: httpx.AsyncClient, url: str, body: bytes) -> dict:
+    """POST and read the response in chunks as the network delivers them.
+
+    The report endpoints can return large bodies; streaming into a bytearray
+    avoids httpx buffering the whole payload before we ever see a byte.
+    """
+    buf = bytearray()
+    async with client.stream("POST", url, content=body, headers=_JSON_HEADERS) as resp:
+        async for chunk in resp.aiter_bytes():
+            buf += chunk
+    return orjson.loads(bytes(buf))
+
+
+_CACHE_DIR = Path.home() / ".cache" / "koddi_healthcheck"
+
+
+async def cached_get(client: httpx.AsyncClient, url: str, ttl: int) -> dict:
+    """GET with an optional on-disk cache for tight cron/systemd-timer loops.
+
+    With --cache-ttl set, a hit younger than the TTL skips the network
+    entirely. Only successful payloads are written so a transient failure
+    is never pinned for the TTL window.
+    """
+    if ttl <= 0:
+        return _json(await client.get(url))
+    path = _CACHE_DIR / f"{hashlib.sha1(url.encode()).hexdigest()}.json"
+    try:
+        if time.time() - path.stat().st_mtime < ttl:
+            return orjson.loads(path.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        # Missing or corrupt cache file — fetch fresh and overwrite it
+        pass
+    data = _json(await client.get(url))
+    if data.get("status") == "success":
+        try:
+            _CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(orjson.dumps(data))
+        except OSError:
+            pass
+    return data
+
+
+_STATUS_ICON: dict[Status, str] = {
+    Status.PASS: "[green]✅ PASS[/green]",
+    Status.WARN: "[yellow]⚠️  WARN[/yellow]",
+    Status.FAIL: "[red]❌ FAIL[/red]",
+    Status.SKIPPED: "[dim]⏭️  SKIPPED[/dim]",
+}
+
+_STATUS_PLAIN: dict[Status, str] = {
+    Status.PASS: "PASS",
+    Status.WARN: "WARN",
+    Status.FAIL: "FAIL",
+    Status.SKIPPED: "SKIPPED",
+}
+
+_STYLE_MAP: dict[Status, str] = {
+    Status.PASS: "green",
+    Status.WARN: "yellow",
+    Status.FAIL: "red",
+    Status.SKIPPED: "dim",
+}
 
 
 def status_icon(status: Status) -> str:
-    return {
-        Status.PASS: "[green]✅ PASS[/green]",
-        Status.WARN: "[yellow]⚠️  WARN[/yellow]",
-        Status.FAIL: "[red]❌ FAIL[/red]",
-        Status.SKIPPED: "[dim]⏭️  SKIPPED[/dim]",
-    }[status]
+    return _STATUS_ICON[status]
 
 
 def status_plain(status: Status) -> str:
-    return {
-        Status.PASS: "PASS",
-        Status.WARN: "WARN",
-        Status.FAIL: "FAIL",
-        Status.SKIPPED: "SKIPPED",
-    }[status]
+    return _STATUS_PLAIN[status]
 
 
-def print_result(result: CheckResult, use_json: bool) -> None:
-    if use_json:
-        return
+def print_result(result: CheckResult) -> None:
+    from rich.markup import escape
+
     icon = status_icon(result.status)
-    console.print(f"  {icon} — {result.details}")
+    # details quote API-controlled text; escape it so bracketed fragments
+    # render literally instead of raising MarkupError
+    console.print(f"  {icon} — {escape(result.details)}")
     console.print()
 
 
-def print_check_header(number: int, name: str, use_json: bool) -> None:
-    if use_json:
-        return
+def print_check_header(number: int, name: str) -> None:
     console.print(f"[bold]🔄 Running Check {number}: {name}...[/bold]")
 
 
-def make_request(
-    client: httpx.Client,
-    method: str,
-    url: str,
-    token: Optional[str] = None,
-    json_body: Optional[dict] = None,
-) -> httpx.Response:
-    headers = {}
-    if token:
-        headers["Authorization"] = token
-    if method == "GET":
-        return client.get(url, headers=headers)
-    return client.post(url, headers=headers, json=json_body)
+def _renderer(print_q: queue.Queue) -> None:
+    """Drain check results and render them off the event-loop thread.
+
+    Rich rendering costs real milliseconds per result; doing it here keeps
+    the loop free to schedule the next HTTP request. A None sentinel stops
+    the thread.
+    """
+    while True:
+        result = print_q.get()
+        try:
+            if result is not None:
+                print_check_header(result.number, result.name)
+                print_result(result)
+        finally:
+            # Always mark the item done — a rendering error must not leave
+            # run_checks blocked on print_q.join()
+            print_q.task_done()
+        if result is None:
+            return
+
+
+def http_check(number: int, name: str):
+    """Wrap a check coroutine with the shared network-failure handling."""
+    def deco(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs) -> CheckResult:
+            try:
+                return await fn(*args, **kwargs)
+            except httpx.TimeoutException:
+                return CheckResult(number, name, Status.FAIL, "Request timed out")
+            except httpx.ConnectError:
+                return CheckResult(number, name, Status.FAIL, "Connection error")
+            except Exception as exc:
+                return CheckResult(number, name, Status.FAIL, f"Unexpected error: {exc}")
+        return wrapper
+    return deco
 
 
 # ---------------------------------------------------------------------------
 # Check 1: Authentication
 # ---------------------------------------------------------------------------
-def check_auth(
-    client: httpx.Client, base_url: str, email: str, password: str, member_group_id: int
+async def check_auth(
+    client: httpx.AsyncClient, base_url: str, email: str, password: str, member_group_id: int
 ) -> tuple[CheckResult, Optional[str]]:
     name = "Authentication"
+    body = orjson.dumps(
+        {
+            "email": email,
+            "password": password,
+            "member_group_id": member_group_id,
+        }
+    )
     try:
-        resp = make_request(
-            client,
-            "POST",
-            f"{base_url}/session/login",
-            json_body={
-                "email": email,
-                "password": password,
-                "member_group_id": member_group_id,
-            },
-        )
-        data = resp.json()
+        # A transient 502/timeout here would skip six downstream checks, so
+        # one login is worth a couple of cheap retries with backoff
+        for attempt in range(3):
+            try:
+                resp = await client.post(
+                    f"{base_url}/session/login", content=body, headers=_JSON_HEADERS
+                )
+            except httpx.TimeoutException:
+                if attempt == 2:
+                    raise
+            else:
+                if resp.status_code < 500:
+                    break
+                if attempt == 2:
+                    # Retries exhausted on a 5xx — the body is likely an HTML
+                    # error page, not JSON worth parsing
+                    return (
+                        CheckResult(1, name, Status.FAIL, f"HTTP {resp.status_code} from API"),
+                        None,
+                    )
+            await asyncio.sleep(0.25 * 2**attempt)
+        data = _json(resp)
         if data.get("status") == "success":
             token = data.get("result", {}).get("token", {}).get("id_token")
             if token:
@@ -130,233 +243,170 @@ def check_auth(
 # ---------------------------------------------------------------------------
 # Check 2: Advertiser Exists
 # ---------------------------------------------------------------------------
-def check_advertiser(
-    client: httpx.Client,
-    base_url: str,
-    token: str,
-    member_group_id: int,
-    advertiser_id: int,
+@http_check(2, "Advertiser Exists")
+async def check_advertiser(
+    client: httpx.AsyncClient,
+    adv_prefix: str,
+    cache_ttl: int,
 ) -> CheckResult:
     name = "Advertiser Exists"
-    try:
-        url = f"{base_url}/member_groups/{member_group_id}/advertisers/{advertiser_id}"
-        resp = make_request(client, "GET", url, token=token)
-        data = resp.json()
-        if data.get("status") == "success":
-            result = data.get("result", {})
-            adv_name = result.get("name", "N/A")
-            adv_status = result.get("status", "N/A")
-            entity_count = result.get("entity_count", "N/A")
-            currency = result.get("currency_code", "N/A")
-            details = (
-                f"Found: {adv_name} | status={adv_status} | "
-                f"entities={entity_count} | currency={currency}"
-            )
-            return CheckResult(2, name, Status.PASS, details)
-        error_code = data.get("error_code", "unknown")
-        error_msg = data.get("message", data.get("error", "unknown error"))
-        return CheckResult(
-            2, name, Status.FAIL, f"Error {error_code}: {error_msg}"
+    data = await cached_get(client, adv_prefix, cache_ttl)
+    if data.get("status") == "success":
+        result = data.get("result", {})
+        adv_name = result.get("name", "N/A")
+        adv_status = result.get("status", "N/A")
+        entity_count = result.get("entity_count", "N/A")
+        currency = result.get("currency_code", "N/A")
+        details = (
+            f"Found: {adv_name} | status={adv_status} | "
+            f"entities={entity_count} | currency={currency}"
         )
-    except httpx.TimeoutException:
-        return CheckResult(2, name, Status.FAIL, "Request timed out")
-    except httpx.ConnectError:
-        return CheckResult(2, name, Status.FAIL, "Connection error")
-    except Exception as exc:
-        return CheckResult(2, name, Status.FAIL, f"Unexpected error: {exc}")
+        return CheckResult(2, name, Status.PASS, details)
+    error_code = data.get("error_code", "unknown")
+    error_msg = data.get("message", data.get("error", "unknown error"))
+    return CheckResult(2, name, Status.FAIL, f"Error {error_code}: {error_msg}")
 
 
 # ---------------------------------------------------------------------------
 # Check 3: Campaigns Report
 # ---------------------------------------------------------------------------
-def check_campaigns(
-    client: httpx.Client,
-    base_url: str,
-    token: str,
-    member_group_id: int,
-    advertiser_id: int,
+def _fmt_campaign(c: dict) -> str:
+    return (
+        f"  • {c.get('name', 'N/A')} | status={c.get('status', 'N/A')} "
+        f"| always_on={c.get('always_on', 'N/A')} "
+        f"| budget={c.get('budget_type', 'N/A')}/{c.get('budget_amount', 'N/A')}"
+    )
+
+
+@http_check(3, "Campaigns Report")
+async def check_campaigns(
+    client: httpx.AsyncClient,
+    adv_prefix: str,
 ) -> CheckResult:
     name = "Campaigns Report"
-    try:
-        url = (
-            f"{base_url}/member_groups/{member_group_id}"
-            f"/advertisers/{advertiser_id}/campaigns_report"
-        )
-        resp = make_request(
-            client, "POST", url, token=token, json_body={"pagination": {"start": 0}}
+    url = f"{adv_prefix}/campaigns_report"
+    data = await _stream_post(client, url, _CAMPAIGNS_BODY)
+    if data.get("status") != "success":
+        error_code = data.get("error_code", "unknown")
+        error_msg = data.get("message", data.get("error", "unknown error"))
+        return CheckResult(
+            3, name, Status.FAIL, f"Error {error_code}: {error_msg}"
         )
-        data = resp.json()
-        if data.get("status") != "success":
-            error_code = data.get("error_code", "unknown")
-            error_msg = data.get("message", data.get("error", "unknown error"))
-            return CheckResult(
-                3, name, Status.FAIL, f"Error {error_code}: {error_msg}"
-            )
-        result = data.get("result", {})
-        campaigns = result.get("campaigns", [])
-        total = result.get("total", len(campaigns))
+    result = data.get("result", {})
+    campaigns = result.get("campaigns", [])
+    total = result.get("total", len(campaigns))
 
-        if total == 0:
-            return CheckResult(
-                3, name, Status.WARN, "⚠️  Zero campaigns found for this advertiser"
-            )
+    if total == 0:
+        return CheckResult(
+            3, name, Status.WARN, "⚠️  Zero campaigns found for this advertiser"
+        )
 
-        lines = [f"Found {total} campaign(s)"]
-        for c in campaigns:
-            c_name = c.get("name", "N/A")
-            c_status = c.get("status", "N/A")
-            always_on = c.get("always_on", "N/A")
-            budget_type = c.get("budget_type", "N/A")
-            budget_amount = c.get("budget_amount", "N/A")
-            lines.append(
-                f"  • {c_name} | status={c_status} | always_on={always_on} "
-                f"| budget={budget_type}/{budget_amount}"
-            )
-        return CheckResult(3, name, Status.PASS, "\n".join(lines))
-    except httpx.TimeoutException:
-        return CheckResult(3, name, Status.FAIL, "Request timed out")
-    except httpx.ConnectError:
-        return CheckResult(3, name, Status.FAIL, "Connection error")
-    except Exception as exc:
-        return CheckResult(3, name, Status.FAIL, f"Unexpected error: {exc}")
+    shown = campaigns[:20]
+    body = "\n".join(_fmt_campaign(c) for c in shown)
+    if total > len(shown):
+        body += f"\n  ... (+{total - len(shown)} more)"
+    return CheckResult(3, name, Status.PASS, f"Found {total} campaign(s)\n{body}")
 
 
 # ---------------------------------------------------------------------------
 # Check 4: Entity Registration Failures
 # ---------------------------------------------------------------------------
-def check_entity_failures(
-    client: httpx.Client,
-    base_url: str,
-    token: str,
-    member_group_id: int,
-    advertiser_id: int,
+@http_check(4, "Entity Registration Failures")
+async def check_entity_failures(
+    client: httpx.AsyncClient,
+    adv_prefix: str,
 ) -> CheckResult:
     name = "Entity Registration Failures"
-    try:
-        url = (
-            f"{base_url}/member_groups/{member_group_id}"
-            f"/advertisers/{advertiser_id}/entity_registrations/failed/report"
-        )
-        resp = make_request(
-            client,
-            "POST",
-            url,
-            token=token,
-            json_body={"pagination": {"count": 50, "start": 0}},
+    url = f"{adv_prefix}/entity_registrations/failed/report"
+    data = await _stream_post(client, url, _FAILURES_BODY)
+    if data.get("status") != "success":
+        error_code = data.get("error_code", "unknown")
+        error_msg = data.get("message", data.get("error", "unknown error"))
+        return CheckResult(
+            4, name, Status.FAIL, f"Error {error_code}: {error_msg}"
         )
-        data = resp.json()
-        if data.get("status") != "success":
-            error_code = data.get("error_code", "unknown")
-            error_msg = data.get("message", data.get("error", "unknown error"))
-            return CheckResult(
-                4, name, Status.FAIL, f"Error {error_code}: {error_msg}"
-            )
-        result = data.get("result", {})
-        total = result.get("total", 0)
-        if total == 0:
-            return CheckResult(4, name, Status.PASS, "No entity registration failures")
-
-        failures = result.get("entity_registrations", [])[:5]
-        lines = [f"⚠️  {total} registration failure(s) found. First {len(failures)}:"]
-        for f in failures:
-            err_msg = f.get("error_message", "N/A")
-            err_code = f.get("error_code", "N/A")
-            lines.append(f"  • [{err_code}] {err_msg}")
-        return CheckResult(4, name, Status.WARN, "\n".join(lines))
-    except httpx.TimeoutException:
-        return CheckResult(4, name, Status.FAIL, "Request timed out")
-    except httpx.ConnectError:
-        return CheckResult(4, name, Status.FAIL, "Connection error")
-    except Exception as exc:
-        return CheckResult(4, name, Status.FAIL, f"Unexpected error: {exc}")
+    result = data.get("result", {})
+    total = result.get("total", 0)
+    if total == 0:
+        return CheckResult(4, name, Status.PASS, "No entity registration failures")
+
+    failures = result.get("entity_registrations", [])[:5]
+    lines = [f"⚠️  {total} registration failure(s) found. First {len(failures)}:"]
+    for f in failures:
+        err_msg = f.get("error_message", "N/A")
+        err_code = f.get("error_code", "N/A")
+        lines.append(f"  • [{err_code}] {err_msg}")
+    return CheckResult(4, name, Status.WARN, "\n".join(lines))
 
 
 # ---------------------------------------------------------------------------
 # Check 5: Active Bidders Cache
 # ---------------------------------------------------------------------------
-def check_active_bidders(
-    client: httpx.Client,
-    base_url: str,
-    token: str,
-    member_group_id: int,
+@http_check(5, "Active Bidders Cache")
+async def check_active_bidders(
+    client: httpx.AsyncClient,
+    mg_prefix: str,
+    cache_ttl: int,
 ) -> CheckResult:
     name = "Active Bidders Cache"
-    try:
-        url = f"{base_url}/member_groups/{member_group_id}/active_bidders"
-        resp = make_request(client, "GET", url, token=token)
-        data = resp.json()
-        if data.get("status") != "success":
-            error_code = data.get("error_code", "unknown")
-            error_msg = data.get("message", data.get("error", "unknown error"))
-            return CheckResult(
-                5, name, Status.FAIL, f"Error {error_code}: {error_msg}"
-            )
-        bidders = data.get("result", {}).get("active_bidders", [])
-        if not bidders:
-            return CheckResult(
-                5,
-                name,
-                Status.WARN,
-                "⚠️  Active bidders list is empty — no ad groups are active",
-            )
+    data = await cached_get(client, f"{mg_prefix}/active_bidders", cache_ttl)
+    if data.get("status") != "success":
+        error_code = data.get("error_code", "unknown")
+        error_msg = data.get("message", data.get("error", "unknown error"))
         return CheckResult(
-            5, name, Status.PASS, f"{len(bidders)} active bidder(s) in cache"
+            5, name, Status.FAIL, f"Error {error_code}: {error_msg}"
         )
-    except httpx.TimeoutException:
-        return CheckResult(5, name, Status.FAIL, "Request timed out")
-    except httpx.ConnectError:
-        return CheckResult(5, name, Status.FAIL, "Connection error")
-    except Exception as exc:
-        return CheckResult(5, name, Status.FAIL, f"Unexpected error: {exc}")
+    bidders = data.get("result", {}).get("active_bidders", [])
+    if not bidders:
+        return CheckResult(
+            5,
+            name,
+            Status.WARN,
+            "⚠️  Active bidders list is empty — no ad groups are active",
+        )
+    return CheckResult(
+        5, name, Status.PASS, f"{len(bidders)} active bidder(s) in cache"
+    )
 
 
 # ---------------------------------------------------------------------------
 # Check 6: Attributable Entities Cache
 # ---------------------------------------------------------------------------
-def check_attributable_entities(
-    client: httpx.Client,
-    base_url: str,
-    token: str,
-    member_group_id: int,
+@http_check(6, "Attributable Entities Cache")
+async def check_attributable_entities(
+    client: httpx.AsyncClient,
+    mg_prefix: str,
+    cache_ttl: int,
 ) -> CheckResult:
     name = "Attributable Entities Cache"
-    try:
-        url = f"{base_url}/member_groups/{member_group_id}/attributable_entities"
-        resp = make_request(client, "GET", url, token=token)
-        data = resp.json()
-        if data.get("status") != "success":
-            error_code = data.get("error_code", "unknown")
-            error_msg = data.get("message", data.get("error", "unknown error"))
-            return CheckResult(
-                6, name, Status.FAIL, f"Error {error_code}: {error_msg}"
-            )
-        entities = data.get("result", {}).get("attributable_entities", [])
-        if not entities:
-            return CheckResult(
-                6,
-                name,
-                Status.WARN,
-                "⚠️  No attributable entities — conversions won't attribute",
-            )
+    data = await cached_get(client, f"{mg_prefix}/attributable_entities", cache_ttl)
+    if data.get("status") != "success":
+        error_code = data.get("error_code", "unknown")
+        error_msg = data.get("message", data.get("error", "unknown error"))
         return CheckResult(
-            6, name, Status.PASS, f"{len(entities)} attributable entit(ies) in cache"
+            6, name, Status.FAIL, f"Error {error_code}: {error_msg}"
         )
-    except httpx.TimeoutException:
-        return CheckResult(6, name, Status.FAIL, "Request timed out")
-    except httpx.ConnectError:
-        return CheckResult(6, name, Status.FAIL, "Connection error")
-    except Exception as exc:
-        return CheckResult(6, name, Status.FAIL, f"Unexpected error: {exc}")
+    entities = data.get("result", {}).get("attributable_entities", [])
+    if not entities:
+        return CheckResult(
+            6,
+            name,
+            Status.WARN,
+            "⚠️  No attributable entities — conversions won't attribute",
+        )
+    return CheckResult(
+        6, name, Status.PASS, f"{len(entities)} attributable entit(ies) in cache"
+    )
 
 
 # ---------------------------------------------------------------------------
 # Check 7: Winning Ads (Test Auction)
 # ---------------------------------------------------------------------------
-def check_winning_ads(
-    client: httpx.Client,
+async def check_winning_ads(
     client_name: str,
     site_id: str,
     experience_name: Optional[str],
+    timeout: int,
 ) -> CheckResult:
     name = "Winning Ads (Test Auction)"
     try:
@@ -372,7 +422,12 @@ def check_winning_ads(
         if experience_name is not None:
             body["experience_name"] = experience_name
 
-        resp = make_request(client, "POST", url, json_body=body)
+        # The auction engine is a different origin and must never see the
+        # console session token, so this check gets its own bare client
+        async with httpx.AsyncClient(timeout=timeout) as auction_client:
+            resp = await auction_client.post(
+                url, content=orjson.dumps(body), headers=_JSON_HEADERS
+            )
         if resp.status_code != 200:
             return CheckResult(
                 7,
@@ -381,7 +436,7 @@ def check_winning_ads(
                 f"HTTP {resp.status_code} — auction engine may be misconfigured "
                 f"or client '{client_name}' is not provisioned",
             )
-        data = resp.json()
+        data = _json(resp)
         listings = data.get("sponsored_listings", [])
         count = len(listings)
         detail = (
@@ -403,10 +458,119 @@ def check_winning_ads(
         return CheckResult(7, name, Status.FAIL, f"Unexpected error: {exc}")
 
 
+# ---------------------------------------------------------------------------
+# Run all checks
+# ---------------------------------------------------------------------------
+async def run_checks(
+    email: str,
+    password: str,
+    member_group_id: int,
+    advertiser_id: int,
+    client_name: str,
+    site_id: str,
+    experience_name: Optional[str],
+    base_url: str,
+    timeout: int,
+    use_json: bool,
+    cache_ttl: int = 0,
+) -> list[CheckResult]:
+    """Run the seven checks, overlapping the ones with no data dependency.
+
+    Checks 2, 5, 6, and 7 only need the auth token; 3 and 4 additionally need
+    the advertiser check to pass. Each tier runs concurrently and results are
+    printed as they complete.
+    """
+    results: list[Optional[CheckResult]] = [None] * 7
+    # Every console URL hangs off one of these two prefixes — build them once
+    mg_prefix = f"{base_url}/member_groups/{member_group_id}"
+    adv_prefix = f"{mg_prefix}/advertisers/{advertiser_id}"
+
+    print_q: queue.Queue = queue.Queue()
+    if not use_json:
+        threading.Thread(target=_renderer, args=(print_q,), daemon=True).start()
+
+    def emit(result: CheckResult) -> None:
+        results[result.number - 1] = result
+        if not use_json:
+            print_q.put(result)
+
+    async def gather_emitting(*coros) -> None:
+        for future in asyncio.as_completed(coros):
+            emit(await future)
+
+    # All console checks hit the same host — size the pool so every request
+    # reuses a kept-alive connection instead of paying TCP+TLS setup
+    limits = httpx.Limits(
+        max_keepalive_connections=10, max_connections=10, keepalive_expiry=60.0
+    )
+    # http2 must live on the transport — client-level kwargs are ignored when
+    # an explicit transport is passed; retries only covers connect failures
+    transport = httpx.AsyncHTTPTransport(retries=2, http2=True, limits=limits)
+    async with httpx.AsyncClient(timeout=timeout, transport=transport) as client:
+        # Compressed JSON is 5-10x fewer wire bytes; httpx decompresses
+        # transparently (brotli support comes from the brotli package)
+        client.headers["Accept-Encoding"] = "gzip, br"
+        # -- Check 1: Auth (everything else except check 7 depends on it) --
+        auth_result, token = await check_auth(
+            client, base_url, email, password, member_group_id
+        )
+        emit(auth_result)
+
+        auth_dependent = [
+            (2, "Advertiser Exists"),
+            (3, "Campaigns Report"),
+            (4, "Entity Registration Failures"),
+            (5, "Active Bidders Cache"),
+            (6, "Attributable Entities Cache"),
+        ]
+
+        if token is not None:
+            # One header set once beats rebuilding a headers dict per request
+            client.headers["Authorization"] = token
+
+        if token is None:
+            # Skip all auth-dependent checks
+            for num, name in auth_dependent:
+                emit(CheckResult(num, name, Status.SKIPPED, "Skipped — authentication failed"))
+            await gather_emitting(
+                check_winning_ads(client_name, site_id, experience_name, timeout)
+            )
+        else:
+            # -- Checks 2, 5, 6, 7: independent once authenticated --
+            await gather_emitting(
+                check_advertiser(client, adv_prefix, cache_ttl),
+                check_active_bidders(client, mg_prefix, cache_ttl),
+                check_attributable_entities(client, mg_prefix, cache_ttl),
+                check_winning_ads(client_name, site_id, experience_name, timeout),
+            )
+
+            # -- Checks 3, 4: depend on the advertiser check --
+            if results[1].status == Status.FAIL:
+                for num, name in auth_dependent[1:3]:
+                    emit(CheckResult(num, name, Status.SKIPPED, "Skipped — advertiser check failed"))
+            else:
+                await gather_emitting(
+                    check_campaigns(client, adv_prefix),
+                    check_entity_failures(client, adv_prefix),
+                )
+
+    if not use_json:
+        # Let the render thread finish before the summary prints
+        print_q.put(None)
+        print_q.join()
+
+    return [r for r in results if r is not None]
+
+
 # ---------------------------------------------------------------------------
 # Summary
 # ---------------------------------------------------------------------------
-def print_summary(results: list[CheckResult]) -> None:
+def print_summary(results: list[CheckResult], use_json: bool = False) -> None:
+    if use_json:
+        return
+    from rich.table import Table
+    from rich.text import Text
+
     console.print()
     console.rule("[bold]Health Check Summary[/bold]")
     console.print()
@@ -418,13 +582,7 @@ def print_summary(results: list[CheckResult]) -> None:
     table.add_column("Details", max_width=60)
 
     for r in results:
-        style_map = {
-            Status.PASS: "green",
-            Status.WARN: "yellow",
-            Status.FAIL: "red",
-            Status.SKIPPED: "dim",
-        }
-        style = style_map[r.status]
+        style = _STYLE_MAP[r.status]
         # Truncate multiline details for the summary table
         short_detail = r.details.split("\n")[0]
         if len(short_detail) > 60:
@@ -438,218 +596,161 @@ def print_summary(results: list[CheckResult]) -> None:
 
     console.print(table)
 
-    passes = sum(1 for r in results if r.status == Status.PASS)
-    warns = sum(1 for r in results if r.status == Status.WARN)
-    fails = sum(1 for r in results if r.status == Status.FAIL)
-    skips = sum(1 for r in results if r.status == Status.SKIPPED)
-
+    counts = Counter(r.status for r in results)
     console.print()
     console.print(
-        f"  [green]{passes} passed[/green]  "
-        f"[yellow]{warns} warning(s)[/yellow]  "
-        f"[red]{fails} failed[/red]  "
-        f"[dim]{skips} skipped[/dim]"
+        f"  [green]{counts[Status.PASS]} passed[/green]  "
+        f"[yellow]{counts[Status.WARN]} warning(s)[/yellow]  "
+        f"[red]{counts[Status.FAIL]} failed[/red]  "
+        f"[dim]{counts[Status.SKIPPED]} skipped[/dim]"
     )
     console.print()
 
 
 def results_to_json(results: list[CheckResult]) -> str:
-    output = []
-    for r in results:
-        output.append(
-            {
-                "check": r.number,
-                "name": r.name,
-                "status": r.status.value,
-                "details": r.details,
-            }
-        )
-    has_failure = any(r.status == Status.FAIL for r in results)
-    return json.dumps(
-        {"checks": output, "overall": "fail" if has_failure else "pass"},
-        indent=2,
-    )
+    return orjson.dumps(
+        {
+            "checks": [
+                {
+                    "check": r.number,
+                    "name": r.name,
+                    "status": r.status.value,
+                    "details": r.details,
+                }
+                for r in results
+            ],
+            "overall": "fail"
+            if any(r.status == Status.FAIL for r in results)
+            else "pass",
+        },
+        option=orjson.OPT_INDENT_2,
+    ).decode()
 
 
 # ---------------------------------------------------------------------------
 # CLI
 # ---------------------------------------------------------------------------
-@click.command()
-@click.option("--email", envvar="KODDI_EMAIL", required=True, help="Koddi account email")
-@click.option(
-    "--password", envvar="KODDI_PASSWORD", required=True, help="Koddi account password"
-)
-@click.option(
-    "--member-group-id",
-    envvar="KODDI_MEMBER_GROUP_ID",
-    required=True,
-    type=int,
-    help="Member group ID",
-)
-@click.option(
-    "--advertiser-id",
-    envvar="KODDI_ADVERTISER_ID",
-    required=True,
-    type=int,
-    help="Advertiser ID",
-)
-@click.option(
-    "--client-name",
-    envvar="KODDI_CLIENT_NAME",
-    required=True,
-    help="Client name for auction engine (e.g. myretailer)",
-)
-@click.option(
-    "--site-id",
-    default="homepage",
-    help="Site ID for test auction (default: homepage)",
-)
-@click.option(
-    "--experience-name",
-    default=None,
-    help="Experience name for test auction (optional)",
-)
-@click.option(
-    "--base-url",
-    default="https://koddi.io/console/v1",
-    show_default=True,
-    help="Base URL for Koddi Console API",
-)
-@click.option(
-    "--timeout",
-    default=30,
-    type=int,
-    show_default=True,
-    help="Request timeout in seconds",
-)
-@click.option(
-    "--json-output",
-    "use_json",
-    is_flag=True,
-    default=False,
-    help="Output results as JSON",
-)
-def main(
-    email: str,
-    password: str,
-    member_group_id: int,
-    advertiser_id: int,
-    client_name: str,
-    site_id: str,
-    experience_name: Optional[str],
-    base_url: str,
-    timeout: int,
-    use_json: bool,
-) -> None:
-    """Koddi Ads implementation health check — validates your setup end-to-end."""
-    base_url = base_url.rstrip("/")
-    results: list[CheckResult] = []
-    token: Optional[str] = None
-    has_failure = False
+def _env_default(var: str) -> dict:
+    """argparse kwargs for an option that falls back to an env var."""
+    value = os.environ.get(var)
+    return {"default": value, "required": value is None}
 
-    if not use_json:
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Koddi Ads implementation health check — validates your setup end-to-end."
+    )
+    parser.add_argument("--email", help="Koddi account email [env: KODDI_EMAIL]", **_env_default("KODDI_EMAIL"))
+    parser.add_argument(
+        "--password", help="Koddi account password [env: KODDI_PASSWORD]", **_env_default("KODDI_PASSWORD")
+    )
+    parser.add_argument(
+        "--member-group-id",
+        type=int,
+        help="Member group ID [env: KODDI_MEMBER_GROUP_ID]",
+        **_env_default("KODDI_MEMBER_GROUP_ID"),
+    )
+    parser.add_argument(
+        "--advertiser-id",
+        type=int,
+        help="Advertiser ID [env: KODDI_ADVERTISER_ID]",
+        **_env_default("KODDI_ADVERTISER_ID"),
+    )
+    parser.add_argument(
+        "--client-name",
+        help="Client name for auction engine (e.g. myretailer) [env: KODDI_CLIENT_NAME]",
+        **_env_default("KODDI_CLIENT_NAME"),
+    )
+    parser.add_argument(
+        "--site-id",
+        default="homepage",
+        help="Site ID for test auction (default: homepage)",
+    )
+    parser.add_argument(
+        "--experience-name",
+        default=None,
+        help="Experience name for test auction (optional)",
+    )
+    parser.add_argument(
+        "--base-url",
+        default="https://koddi.io/console/v1",
+        help="Base URL for Koddi Console API (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--timeout",
+        default=30,
+        type=int,
+        help="Request timeout in seconds (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        default=0,
+        type=int,
+        help="Reuse cached GET responses younger than this many seconds "
+        "(0 disables; useful for per-minute cron runs)",
+    )
+    parser.add_argument(
+        "--json-output",
+        dest="use_json",
+        action="store_true",
+        help="Output results as JSON",
+    )
+    return parser
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = _build_parser()
+    args = parser.parse_args()
+    # argparse applies type= only to command-line strings; env-provided
+    # defaults arrive raw, so cast them here with the same clean error
+    for opt in ("member_group_id", "advertiser_id"):
+        value = getattr(args, opt)
+        if isinstance(value, str):
+            try:
+                setattr(args, opt, int(value))
+            except ValueError:
+                parser.error(
+                    f"argument --{opt.replace('_', '-')}: invalid int value: {value!r}"
+                )
+    return args
+
+
+def main() -> None:
+    args = _parse_args()
+    base_url = args.base_url.rstrip("/")
+
+    if not args.use_json:
+        from rich.console import Console
+
+        global console
+        console = Console()
         console.print()
         console.rule("[bold blue]Koddi Health Check[/bold blue]")
         console.print(
-            f"  member_group_id={member_group_id}  advertiser_id={advertiser_id}  "
-            f"client={client_name}"
+            f"  member_group_id={args.member_group_id}  advertiser_id={args.advertiser_id}  "
+            f"client={args.client_name}"
         )
         console.print()
 
-    with httpx.Client(timeout=timeout) as client:
-        # -- Check 1: Auth --
-        print_check_header(1, "Authentication", use_json)
-        auth_result, token = check_auth(
-            client, base_url, email, password, member_group_id
+    results = asyncio.run(
+        run_checks(
+            args.email,
+            args.password,
+            args.member_group_id,
+            args.advertiser_id,
+            args.client_name,
+            args.site_id,
+            args.experience_name,
+            base_url,
+            args.timeout,
+            args.use_json,
+            args.cache_ttl,
         )
-        results.append(auth_result)
-        print_result(auth_result, use_json)
-        if auth_result.status == Status.FAIL:
-            has_failure = True
-
-        # Checks 2-6 require auth
-        auth_dependent = [
-            (2, "Advertiser Exists"),
-            (3, "Campaigns Report"),
-            (4, "Entity Registration Failures"),
-            (5, "Active Bidders Cache"),
-            (6, "Attributable Entities Cache"),
-        ]
-
-        if token is None:
-            # Skip all auth-dependent checks
-            for num, name in auth_dependent:
-                r = CheckResult(num, name, Status.SKIPPED, "Skipped — authentication failed")
-                results.append(r)
-                print_check_header(num, name, use_json)
-                print_result(r, use_json)
-        else:
-            # -- Check 2: Advertiser --
-            print_check_header(2, "Advertiser Exists", use_json)
-            r2 = check_advertiser(
-                client, base_url, token, member_group_id, advertiser_id
-            )
-            results.append(r2)
-            print_result(r2, use_json)
-            if r2.status == Status.FAIL:
-                has_failure = True
-                # Skip checks 3-4 that depend on advertiser
-                for num, name in auth_dependent[1:3]:
-                    r = CheckResult(
-                        num, name, Status.SKIPPED, "Skipped — advertiser check failed"
-                    )
-                    results.append(r)
-                    print_check_header(num, name, use_json)
-                    print_result(r, use_json)
-            else:
-                # -- Check 3: Campaigns --
-                print_check_header(3, "Campaigns Report", use_json)
-                r3 = check_campaigns(
-                    client, base_url, token, member_group_id, advertiser_id
-                )
-                results.append(r3)
-                print_result(r3, use_json)
-                if r3.status == Status.FAIL:
-                    has_failure = True
-
-                # -- Check 4: Entity Failures --
-                print_check_header(4, "Entity Registration Failures", use_json)
-                r4 = check_entity_failures(
-                    client, base_url, token, member_group_id, advertiser_id
-                )
-                results.append(r4)
-                print_result(r4, use_json)
-                if r4.status == Status.FAIL:
-                    has_failure = True
-
-            # -- Check 5: Active Bidders (depends on auth, not advertiser) --
-            print_check_header(5, "Active Bidders Cache", use_json)
-            r5 = check_active_bidders(client, base_url, token, member_group_id)
-            results.append(r5)
-            print_result(r5, use_json)
-            if r5.status == Status.FAIL:
-                has_failure = True
-
-            # -- Check 6: Attributable Entities (depends on auth, not advertiser) --
-            print_check_header(6, "Attributable Entities Cache", use_json)
-            r6 = check_attributable_entities(
-                client, base_url, token, member_group_id
-            )
-            results.append(r6)
-            print_result(r6, use_json)
-            if r6.status == Status.FAIL:
-                has_failure = True
-
-        # -- Check 7: Winning Ads (no auth needed, but needs client_name) --
-        print_check_header(7, "Winning Ads (Test Auction)", use_json)
-        r7 = check_winning_ads(client, client_name, site_id, experience_name)
-        results.append(r7)
-        print_result(r7, use_json)
-        if r7.status == Status.FAIL:
-            has_failure = True
+    )
+    has_failure = any(r.status == Status.FAIL for r in results)
 
-    if use_json:
-        click.echo(results_to_json(results))
+    if args.use_json:
+        print(results_to_json(results))
     else:
         print_summary(results)
 